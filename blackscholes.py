@@ -1,24 +1,214 @@
-from math import exp, log, sqrt
+from functools import lru_cache
+from math import copysign, exp, log, sqrt
+from typing import NamedTuple
+import numpy as np
 import streamlit as st
-from scipy import stats
+from scipy.special import ndtr
 
-def BlackScholes(S, K, T, r, sigma, option_type='call'):
-    """Calculate Black-Scholes option price."""
+try:
+    from numba import njit
+except ImportError:  # numba is optional, grid pricing falls back to NumPy
+    njit = None
+
+try:
+    import cupy as cp
+    from cupyx.scipy.special import ndtr as cp_ndtr
+    cp.cuda.runtime.getDeviceCount()
+except Exception:  # cupy is optional and also needs a working CUDA device
+    cp = None
+
+M_SQRT1_2 = 0.7071067811865476
+M_1_SQRT2PI = 0.3989422804014327
+
+# Below this many cells the host-device copies cost more than the GPU saves
+GPU_MIN_CELLS = 4096
+
+class Greeks(NamedTuple):
+    """Option Greeks; vega and rho are per 1% change, theta is per day."""
+    delta: float
+    gamma: float
+    theta: float
+    vega: float
+    rho: float
 
+def _norm_pdf(x):
+    """Standard normal PDF, 1/sqrt(2*pi) * exp(-x^2 / 2)."""
+    return exp(-0.5 * x * x) * M_1_SQRT2PI
+
+def _check_inputs(S, K, T, sigma, option_type):
+    """Raise ValueError for inputs the Black-Scholes formula can't price."""
     if S <= 0 or K<= 0 or sigma <= 0 or T <= 0:
         raise ValueError("Must use positive numbers.")
     if option_type not in ['call', 'put']:
         raise ValueError("option_type must be 'call' or 'put'.")
-    
-    d1 = (log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * sqrt(T))
-    d2 = d1 - sigma * sqrt(T)
-    
+
+def BlackScholes(S, K, T, r, sigma, option_type='call'):
+    """Calculate Black-Scholes option price."""
+    _check_inputs(S, K, T, sigma, option_type)
+    return _bs_unchecked(S, K, T, r, sigma, option_type)
+
+@lru_cache(maxsize=1024)
+def _bs_unchecked(S, K, T, r, sigma, option_type='call'):
+    """BlackScholes without input validation; callers guarantee valid inputs."""
+    sqrtT = sqrt(T)
+    vst = sigma * sqrtT
+    d1 = (log(S / K) + (r + 0.5 * sigma * sigma) * T) / vst
+    d2 = d1 - vst
+    disc = exp(-r * T)
+
+    # +1 for calls, -1 for puts: P = K*disc*N(-d2) - S*N(-d1)
+    sign = 1.0 if option_type == 'call' else -1.0
+    return sign * (S * ndtr(sign * d1) - K * disc * ndtr(sign * d2))
+
+def _array_module(n_cells):
+    """Return cupy for grids large enough to benefit from the GPU, else numpy."""
+    return cp if cp is not None and n_cells >= GPU_MIN_CELLS else np
+
+def _greeks(S, K, T, r, sigma, sqrtT, Nd1, Nd2, nd1, disc, option_type):
+    """Greeks from precomputed terms; works on floats and arrays alike."""
+    gamma = nd1 / (S * sigma * sqrtT)
+    vega = S * nd1 * sqrtT / 100  # Divided by 100 for 1% change (display)
+    decay = -S * nd1 * sigma / (2 * sqrtT)
+
+    # The put side uses N(-x) = 1 - N(x), so no extra CDFs are needed
     if option_type == 'call':
-        price = S * stats.norm.cdf(d1) - K * exp(-r * T) * stats.norm.cdf(d2)
+        delta = Nd1
+        theta = (decay - r * K * disc * Nd2) / 365
+        rho = K * T * disc * Nd2 / 100  # Divided by 100 for 1% change (display)
+    else:
+        delta = Nd1 - 1
+        theta = (decay + r * K * disc * (1 - Nd2)) / 365
+        rho = -K * T * disc * (1 - Nd2) / 100  # Divided by 100 for 1% change (display)
+
+    return Greeks(delta, gamma, theta, vega, rho)
+
+def _bs_core(S, K, T, r, sigma, xp=np):
+    """Terms shared by bs_vec and greeks_vec: sqrt(T), N(d1), N(d2), n(d1), exp(-rT)."""
+    norm_cdf = cp_ndtr if xp is not np else ndtr
+
+    if np.ndim(T) == 0 and np.ndim(r) == 0:
+        # Plain floats broadcast as constants (one exp in total) and don't
+        # upcast float32 grids the way NumPy float64 scalars would
+        sqrtT = sqrt(T)
+        disc = exp(-r * T)
+    else:
+        sqrtT = xp.sqrt(T)
+        disc = xp.exp(-r * T)
+
+    vst = sigma * sqrtT
+    d1 = (xp.log(S / K) + (r + 0.5 * sigma ** 2) * T) / vst
+    d2 = d1 - vst
+    nd1 = xp.exp(-0.5 * d1 * d1) * M_1_SQRT2PI
+
+    return sqrtT, norm_cdf(d1), norm_cdf(d2), nd1, disc
+
+def bs_vec(S, K, T, r, sigma, option_type='call', xp=np):
+    """Vectorized Black-Scholes price over broadcastable arrays of inputs.
+
+    Pass xp=cupy to price on the GPU; the result is always a NumPy array.
+    """
+    S = xp.asarray(S)
+    sigma = xp.asarray(sigma)
+    _, Nd1, Nd2, _, disc = _bs_core(S, K, T, r, sigma, xp)
+
+    price = S * Nd1 - K * disc * Nd2
+    if option_type == 'put':
+        price = price - S + K * disc  # Put-call parity
+
+    return price if xp is np else cp.asnumpy(price)
+
+def greeks_vec(S, K, T, r, sigma, option_type='call', xp=np):
+    """Vectorized Greeks over broadcastable arrays of inputs.
+
+    Returns a Greeks tuple of NumPy arrays, with the same units as
+    calculate_greeks.
+    """
+    S = xp.asarray(S)
+    sigma = xp.asarray(sigma)
+    sqrtT, Nd1, Nd2, nd1, disc = _bs_core(S, K, T, r, sigma, xp)
+    greeks = _greeks(S, K, T, r, sigma, sqrtT, Nd1, Nd2, nd1, disc, option_type)
+
+    if xp is not np:
+        greeks = Greeks(*(cp.asnumpy(g) for g in greeks))
+    return greeks
+
+if njit is not None:
+    @njit(cache=True, fastmath=True, inline='always')
+    def _norm_cdf(x):
+        """Standard normal CDF via Abramowitz & Stegun 7.1.26 (abs error < 7.5e-8)."""
+        # N(x) = 0.5 * (1 + sign(x) * erf(|x| / sqrt(2)))
+        z = abs(x) * M_SQRT1_2
+        t = 1.0 / (1.0 + 0.3275911 * z)
+        poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741
+                    + t * (-1.453152027 + t * 1.061405429))))
+        erf_z = 1.0 - poly * exp(-z * z)
+        return 0.5 + copysign(0.5 * erf_z, x)
+
+    # Serial on purpose: Streamlit runs every session in its own thread, and
+    # concurrent parallel regions abort the process under the workqueue layer
+    @njit(cache=True, fastmath=True)
+    def _bs_grid_kernel(S_grid, V_grid, K, rT, halfT, sqrtT, K_disc, out):
+        """Fill out[0, i, j] (call) and out[1, i, j] (put) at (V_grid[i], S_grid[j])."""
+        # log(S/K) only varies along the spot axis, so take it out of the vol loop
+        logSK = np.log(S_grid / K)
+
+        for i in range(V_grid.size):
+            v = V_grid[i]
+            vst = v * sqrtT
+            drift = rT + halfT * v * v
+
+            for j in range(S_grid.size):
+                s = S_grid[j]
+                d1 = (logSK[j] + drift) / vst
+                d2 = d1 - vst
+
+                cdf1 = _norm_cdf(d1)
+                cdf2 = _norm_cdf(d2)
+                call = s * cdf1 - K_disc * cdf2
+                out[0, i, j] = call
+                out[1, i, j] = call - s + K_disc  # Put-call parity
+else:
+    _bs_grid_kernel = None
+
+def make_bs_grid(K, T, r):
+    """Specialize grid pricing for fixed K, T and r.
+
+    Returns f(S_grid, V_grid, out), which fills a (2, len(V_grid),
+    len(S_grid)) array in place with call prices in out[0] and put prices
+    in out[1], both from a single pass over the grid. Everything that only
+    depends on K, T and r is folded into the closure, so the per-cell work
+    is two CDFs and a handful of multiplies. With numba installed the CDF is
+    the polynomial approximation in _norm_cdf, so prices agree with
+    BlackScholes to about 1e-7 * S. Grids of at least GPU_MIN_CELLS cells
+    are priced with bs_vec on the GPU when cupy is available.
+    """
+    sqrtT = sqrt(T)
+    rT = r * T
+    halfT = 0.5 * T
+    K_disc = K * exp(-rT)
+
+    if _bs_grid_kernel is not None:
+        def fill_cpu(S_grid, V_grid, out):
+            _bs_grid_kernel(S_grid, V_grid, K, rT, halfT, sqrtT, K_disc, out)
     else:
-        price = K * exp(-r * T) * stats.norm.cdf(-d2) - S * stats.norm.cdf(-d1)
-    
-    return price
+        def fill_cpu(S_grid, V_grid, out):
+            logSK = np.log(S_grid / K)[None, :]
+            v = V_grid[:, None]
+            vst = v * sqrtT
+            d1 = (logSK + (rT + halfT * v * v)) / vst
+            d2 = d1 - vst
+            out[0] = S_grid[None, :] * ndtr(d1) - K_disc * ndtr(d2)
+            out[1] = out[0] - S_grid[None, :] + K_disc  # Put-call parity
+
+    def f(S_grid, V_grid, out):
+        xp = _array_module(out[0].size)
+        if xp is np:
+            fill_cpu(S_grid, V_grid, out)
+        else:
+            out[0] = bs_vec(S_grid[None, :], K, T, r, V_grid[:, None], 'call', xp=xp)
+            out[1] = out[0] - S_grid[None, :] + K_disc  # Put-call parity
+
+    return f
 
 def calculate_option_price():
     st.title("Black-Scholes Option Pricing Calculator")
@@ -40,38 +230,21 @@ def calculate_option_price():
 
 def calculate_greeks(S, K, T, r, sigma, option_type='call'):
     """Calculate option Greeks."""
-    d1 = (log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * sqrt(T))
-    d2 = d1 - sigma * sqrt(T)
+    return price_and_greeks(S, K, T, r, sigma, option_type)[2]
 
-    # Delta 
-    if option_type == 'call':
-        delta = stats.norm.cdf(d1)
-    else:
-        delta = stats.norm.cdf(d1) - 1
+@lru_cache(maxsize=1024)
+def price_and_greeks(S, K, T, r, sigma, option_type='call'):
+    """Calculate call and put prices plus the Greeks for option_type in one pass."""
+    sqrtT = sqrt(T)
+    vst = sigma * sqrtT
+    d1 = (log(S / K) + (r + 0.5 * sigma * sigma) * T) / vst
+    d2 = d1 - vst
+    disc = exp(-r * T)
+    Nd1 = ndtr(d1)
+    Nd2 = ndtr(d2)
+    nd1 = _norm_pdf(d1)
 
-    # Gamma (same for call and put)
-    gamma = stats.norm.pdf(d1) / (S * sigma * sqrt(T))
+    call = S * Nd1 - K * disc * Nd2
+    put = call - S + K * disc  # Put-call parity
 
-    # Vega (same for call and put)
-    vega = S * stats.norm.pdf(d1) * sqrt(T) / 100  # Divided by 100 for 1% change (display)
-
-    # Theta
-    if option_type == 'call':
-        theta = (-S * stats.norm.pdf(d1) * sigma / (2 * sqrt(T)) - r * K * exp(-r * T) * stats.norm.cdf(d2))   / 365
-    
-    else:
-        theta = (-S * stats.norm.pdf(d1) * sigma / (2 * sqrt(T)) + r * K * exp(-r * T) * stats.norm.cdf(-d2)) / 365
-    
-    # Rho
-    if option_type == 'call':
-        rho = K * T * exp(-r * T) * stats.norm.cdf(d2) / 100  # Divided by 100 for 1% change (display)
-    else:
-        rho = -K * T * exp(-r * T) * stats.norm.cdf(-d2) / 100  # Divided by 100 for 1% change (display)
-
-    return {
-        'delta': delta,
-        'gamma': gamma,
-        'theta': theta,
-        'vega': vega,
-        'rho': rho
-    }
+    return call, put, _greeks(S, K, T, r, sigma, sqrtT, Nd1, Nd2, nd1, disc, option_type)
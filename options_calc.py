@@ -1,8 +1,9 @@
 import streamlit as st
 import matplotlib.pyplot as plt
 import numpy as np
+import plotly.graph_objects as go
 
-from blackscholes import BlackScholes, calculate_greeks
+from blackscholes import Greeks, _bs_unchecked, greeks_vec, make_bs_grid, price_and_greeks
 
 st.set_page_config("Black-Scholes Option Pricing Model", layout="wide")
 st.title("Black-Scholes Option Pricing Model")
@@ -31,6 +32,55 @@ def sidebar_core():
     return S, K, T, r, sigma 
 
 
+# Grid pricer specialized for (K, T, r), kept warm across reruns
+@st.cache_resource(max_entries=16)
+def _grid_pricer(K, T, r):
+    return make_bs_grid(K, T, r)
+
+
+# Heatmap grids, memoized across reruns so widget changes that don't
+# touch the pricing inputs (e.g. purchase prices) skip the recompute
+@st.cache_data(max_entries=32)
+def _grid(S_min, S_max, V_min, V_max, K, T, r, n=25):
+    # Single precision is plenty for prices displayed to the cent
+    S_grid = np.linspace(S_min, S_max, n, dtype=np.float32)
+    V_grid = np.linspace(V_min, V_max, n, dtype=np.float32)
+    # Calls in grids[0], puts in grids[1], filled in one pass
+    grids = np.empty((2, n, n), dtype=np.float32)
+    _grid_pricer(K, T, r)(S_grid, V_grid, grids)
+    return S_grid, V_grid, grids
+
+
+# Greek surfaces over the same grid as _grid, one Greeks tuple per option type
+@st.cache_data(max_entries=16)
+def _greek_grid(S_min, S_max, V_min, V_max, K, T, r, n=25):
+    S_grid = np.linspace(S_min, S_max, n, dtype=np.float32)
+    V_grid = np.linspace(V_min, V_max, n, dtype=np.float32)
+    return tuple(
+        greeks_vec(S_grid[None, :], K, T, r, V_grid[:, None], option_type)
+        for option_type in ("call", "put")
+    )
+
+
+# Heatmap figure, keyed on the raw grid bytes and dtype so identical inputs
+# reuse it. Plotly ships the grid to the browser, which does the colormapping.
+@st.cache_resource(max_entries=64)
+def _heatmap_fig(vals_bytes, dtype, shape, extent, colorscale, title):
+    vals = np.frombuffer(vals_bytes, dtype=dtype).reshape(shape)
+    s_min, s_max, v_min, v_max = extent
+
+    fig = go.Figure(data=go.Heatmap(
+        z=vals,
+        x=np.linspace(s_min, s_max, shape[1]),
+        y=np.linspace(v_min, v_max, shape[0]),
+        colorscale=colorscale
+    ))
+    fig.update_layout(
+        title=title, xaxis_title="Spot Price", yaxis_title="Volatility (%)"
+    )
+    return fig
+
+
 
 # Page 1: Option Pricer
 if page == "Option Pricer":
@@ -38,12 +88,9 @@ if page == "Option Pricer":
     S, K, T, r, sigma = sidebar_core()
     option_type = st.sidebar.selectbox("Option Type", ['call', 'put'])
 
-    call_price = BlackScholes(S, K, T, r, sigma, 'call')
-    put_price = BlackScholes(S, K, T, r, sigma, 'put')
+    call_price, put_price, greeks = price_and_greeks(S, K, T, r, sigma, option_type)
     price = call_price if option_type == 'call' else put_price
 
-    greeks = calculate_greeks(S, K, T, r, sigma, option_type)
-
     c1, c2, c3 = st.columns(3)
     c1.metric("Call Price", f"${call_price:.2f}")
     c2.metric("Put Price", f"${put_price:.2f}")
@@ -53,11 +100,11 @@ if page == "Option Pricer":
     st.subheader("Greeks")
 
     cols = st.columns(5)
-    cols[0].metric("Delta", f"{greeks['delta']:.4f}")
-    cols[1].metric("Gamma", f"{greeks['gamma']:.4f}")
-    cols[2].metric("Vega (per 1%)", f"{greeks['vega']:.4f}")
-    cols[3].metric("Theta (per day)", f"{greeks['theta']:.4f}")
-    cols[4].metric("Rho (per 1%)", f"{greeks['rho']:.4f}")
+    cols[0].metric("Delta", f"{greeks.delta:.4f}")
+    cols[1].metric("Gamma", f"{greeks.gamma:.4f}")
+    cols[2].metric("Vega (per 1%)", f"{greeks.vega:.4f}")
+    cols[3].metric("Theta (per day)", f"{greeks.theta:.4f}")
+    cols[4].metric("Rho (per 1%)", f"{greeks.rho:.4f}")
 
     # Greeks explanation
     with st.expander("Understanding the Greeks - Click to Learn More"):
@@ -66,7 +113,7 @@ if page == "Option Pricer":
         )
         with greek_tab1:
             st.markdown("### Delta")
-            st.write(f'**Current Value:** {greeks["delta"]:.4f}')
+            st.write(f'**Current Value:** {greeks.delta:.4f}')
             st.write("""
     **Definition:** 
 
@@ -83,20 +130,20 @@ if page == "Option Pricer":
             st.write("**Example:**")
             if option_type == 'call':
                 st.info(f"""
-    Your call option has a delta of {greeks['delta']:.4f}.
+    Your call option has a delta of {greeks.delta:.4f}.
 
-    If the stock price increases by \\$1, the option price is expected to increase by approximately \\${greeks['delta']:.2f}, from \\${price:.2f} to \\${price + greeks['delta']:.2f}.
+    If the stock price increases by \\$1, the option price is expected to increase by approximately \\${greeks.delta:.2f}, from \\${price:.2f} to \\${price + greeks.delta:.2f}.
     """)
             else:
                 st.info(f"""
-    Your put option has a delta of {greeks['delta']:.4f}.
+    Your put option has a delta of {greeks.delta:.4f}.
 
-    If the stock price increases by \\$1, the option price is expected to decrease by approximately \\${abs(greeks['delta']):.2f}, from \\${price:.2f} to \\${price + greeks['delta']:.2f}.
+    If the stock price increases by \\$1, the option price is expected to decrease by approximately \\${abs(greeks.delta):.2f}, from \\${price:.2f} to \\${price + greeks.delta:.2f}.
     """)
 
         with greek_tab2:
             st.markdown("### Gamma")
-            st.write(f"**Current Value:** {greeks['gamma']:.4f}")
+            st.write(f"**Current Value:** {greeks.gamma:.4f}")
             st.write("""
     **Definition:** 
     Gamma measures the rate of change of *delta* with respect to changes in the underlying asset's price. It indicates how much the option's *delta* is expected to change for a $1 change in the underlying asset's price.
@@ -110,16 +157,16 @@ if page == "Option Pricer":
     """)
             st.write("**Example:**")
             st.info(f"""
-    Your option has a gamma of {greeks['gamma']:.4f}.
+    Your option has a gamma of {greeks.gamma:.4f}.
 
-    If the stock price increases by \\$1, the option's *delta* is expected to increase by approximately \\${greeks['gamma']:.2f}, from \\${greeks['delta']:.2f} to \\${greeks['delta'] + greeks['gamma']:.2f}.
-    This means the option's sensitivity to price changes is {'increasing' if greeks['gamma'] > 0 else 'decreasing'}.
+    If the stock price increases by \\$1, the option's *delta* is expected to increase by approximately \\${greeks.gamma:.2f}, from \\${greeks.delta:.2f} to \\${greeks.delta + greeks.gamma:.2f}.
+    This means the option's sensitivity to price changes is {'increasing' if greeks.gamma > 0 else 'decreasing'}.
     """)
 
 
         with greek_tab3:
             st.markdown("### Vega")
-            st.write(f"**Current Value:** {greeks['vega']:.4f}")
+            st.write(f"**Current Value:** {greeks.vega:.4f}")
             st.write("""
     **Definition:** 
     Vega measures the rate of change of the option price with respect to changes in the underlying asset's implied volatility (IV). It indicates how much the option price is expected to change for a 1% change in the underlying asset's implied volatility.
@@ -133,9 +180,9 @@ if page == "Option Pricer":
     """)
             st.write("**Example:**")
             st.info(f"""
-    Your option has a vega of {greeks['vega']:.4f}.
+    Your option has a vega of {greeks.vega:.4f}.
 
-    If the underlying asset's IV increases by 1%, the option price is expected to increase by approximately \\${greeks['vega']:.2f}, from \\${price:.2f} to \\${price + greeks['vega']:.2f}.
+    If the underlying asset's IV increases by 1%, the option price is expected to increase by approximately \\${greeks.vega:.2f}, from \\${price:.2f} to \\${price + greeks.vega:.2f}.
     """)
             st.divider()
             st.caption(f"""
@@ -146,7 +193,7 @@ if page == "Option Pricer":
 
         with greek_tab4:
             st.markdown("### Theta")
-            st.write(f"**Current Value:** {greeks['theta']:.4f}")
+            st.write(f"**Current Value:** {greeks.theta:.4f}")
             st.write("""
     **Definition:** 
     Theta measures the rate of change of the option price with respect to changes in time (time decay). It indicates how much the option price is expected to decrease for a one-day passage of time.
@@ -160,14 +207,14 @@ if page == "Option Pricer":
     """)
             st.write("**Example:**")
             st.info(f"""
-    Your option has a theta of {greeks['theta']:.4f}.
+    Your option has a theta of {greeks.theta:.4f}.
 
-    If one day passes, the option price is expected to decrease by approximately \\${abs(greeks['theta']):.2f}, from \\${price:.2f} to \\${price - abs(greeks['theta']):.2f}.
+    If one day passes, the option price is expected to decrease by approximately \\${abs(greeks.theta):.2f}, from \\${price:.2f} to \\${price - abs(greeks.theta):.2f}.
     This means the option's value is decreasing due to time decay.
     """)
         with greek_tab5:
             st.markdown("### Rho")
-            st.write(f"**Current Value:** {greeks['rho']:.4f}")
+            st.write(f"**Current Value:** {greeks.rho:.4f}")
             st.write("""
     **Definition:**
     Rho measures the rate of change of the option price with respect to changes in the risk-free interest rate. It indicates how much the option price is expected to change for a 1% change in the risk-free interest rate.
@@ -180,9 +227,9 @@ if page == "Option Pricer":
     """)
             st.write("**Example:**")
             st.info(f"""
-    Your option has a rho of {greeks['rho']:.4f}.
+    Your option has a rho of {greeks.rho:.4f}.
 
-    If the risk-free interest rate increases by 1%, the option price is expected to increase by approximately \\${abs(greeks['rho']):.2f}, from \\${price:.2f} to \\${price + abs(greeks['rho']):.2f}.
+    If the risk-free interest rate increases by 1%, the option price is expected to increase by approximately \\${abs(greeks.rho):.2f}, from \\${price:.2f} to \\${price + abs(greeks.rho):.2f}.
     """)
             st.divider()
             st.caption(f"""
@@ -210,7 +257,8 @@ elif page == "Payoff Diagram":
     S, K, T, r, sigma = sidebar_core()
     option_type = st.sidebar.selectbox("Option Type", ["call", "put"])
 
-    premium = BlackScholes(S, K, T, r, sigma, option_type)
+    # sidebar_core's min values keep S, K, T and sigma positive
+    premium = _bs_unchecked(S, K, T, r, sigma, option_type)
 
     S_range = np.linspace(0.5 * S, 1.5 * S, 300)
     payoff = (
@@ -232,6 +280,7 @@ elif page == "Payoff Diagram":
     ax.grid(alpha=0.3)
 
     st.pyplot(fig)
+    plt.close(fig)
 
 # Page 3: Value Heatmaps
 
@@ -243,37 +292,32 @@ elif page == "Sensitivity Analysis":
     s_max = st.sidebar.number_input("Max Spot", value=1.3 * S)
     v_min = st.sidebar.slider("Min Vol (%)", 1, 100, 10) / 100
     v_max = st.sidebar.slider("Max Vol (%)", 1, 150, 40) / 100
+    n = st.sidebar.slider("Heatmap Resolution", 25, 256, 25)
 
-    S_grid = np.linspace(s_min, s_max, 25)
-    V_grid = np.linspace(v_min, v_max, 25)
+    S_grid, V_grid, (call_vals, put_vals) = _grid(s_min, s_max, v_min, v_max, K, T, r, n)
 
-    call_vals = np.array([
-        [BlackScholes(s, K, T, r, v, "call") for s in S_grid]
-        for v in V_grid
-    ])
+    extent = (s_min, s_max, v_min * 100, v_max * 100)
+    col1, col2 = st.columns(2)
+    col1.plotly_chart(_heatmap_fig(
+        call_vals.tobytes(), call_vals.dtype.str, call_vals.shape,
+        extent, "Viridis", "Call Option Value"
+    ))
+    col2.plotly_chart(_heatmap_fig(
+        put_vals.tobytes(), put_vals.dtype.str, put_vals.shape,
+        extent, "Viridis", "Put Option Value"
+    ))
 
-    put_vals = np.array([
-        [BlackScholes(s, K, T, r, v, "put") for s in S_grid]
-        for v in V_grid
-    ])
+    st.subheader("Greek Surfaces")
+    greek = st.selectbox("Greek", Greeks._fields, format_func=str.title)
+    call_greeks, put_greeks = _greek_grid(s_min, s_max, v_min, v_max, K, T, r, n)
 
-    fig, axs = plt.subplots(1, 2, figsize=(16,6))
-
-    im1 = axs[0].imshow(
-        call_vals, origin="lower", aspect="auto",
-        extent=[s_min, s_max, v_min * 100, v_max * 100]
-    )
-    fig.colorbar(im1, ax=axs[0])
-    axs[0].set_title("Call Option Value")
-
-    im2 = axs[1].imshow(
-        put_vals, origin="lower", aspect="auto",
-        extent=[s_min, s_max, v_min * 100, v_max * 100]
-    )
-    fig.colorbar(im2, ax=axs[1])
-    axs[1].set_title("Put Option Value")
-
-    st.pyplot(fig)
+    col1, col2 = st.columns(2)
+    for col, greeks, label in ((col1, call_greeks, "Call"), (col2, put_greeks, "Put")):
+        vals = getattr(greeks, greek)
+        col.plotly_chart(_heatmap_fig(
+            vals.tobytes(), vals.dtype.str, vals.shape,
+            extent, "Viridis", f"{label} {greek.title()}"
+        ))
 
 
 
@@ -282,47 +326,34 @@ elif page == "P&L Heatmaps":
     st.sidebar.subheader("Purchase Prices")
     S, K, T, r, sigma = sidebar_core()
 
+    # sidebar_core's min values keep S, K, T and sigma positive
     call_buy = st.sidebar.number_input(
         "Call Purchase Price",
-        value=BlackScholes(S, K, T, r, sigma, "call")
+        value=_bs_unchecked(S, K, T, r, sigma, "call")
     )
     put_buy = st.sidebar.number_input(
         "Put Purchase Price",
-        value=BlackScholes(S, K, T, r, sigma, "put")
+        value=_bs_unchecked(S, K, T, r, sigma, "put")
     )
 
     s_min = st.sidebar.number_input("Min Spot", value=0.7 * S)
     s_max = st.sidebar.number_input("Max Spot", value=1.3 * S)
     v_min = st.sidebar.slider("Min Vol (%)", 1, 100, 10) / 100
     v_max = st.sidebar.slider("Max Vol (%)", 1, 150, 40) / 100
+    n = st.sidebar.slider("Heatmap Resolution", 25, 256, 25)
 
-    S_grid = np.linspace(s_min, s_max, 25)
-    V_grid = np.linspace(v_min, v_max, 25)
+    S_grid, V_grid, (call_vals, put_vals) = _grid(s_min, s_max, v_min, v_max, K, T, r, n)
 
-    call_pnl = np.array([
-        [BlackScholes(s, K, T, r, v, "call") - call_buy for s in S_grid]
-        for v in V_grid
-    ])
-
-    put_pnl = np.array([
-        [BlackScholes(s, K, T, r, v, "put") - put_buy for s in S_grid]
-        for v in V_grid
-    ])
-    
-    fig, axs = plt.subplots(1, 2, figsize=(16,6))
-
-    im1 = axs[0].imshow(
-        call_pnl, origin="lower", aspect="auto", cmap="RdYlGn",
-        extent=[s_min, s_max, v_min * 100, v_max * 100]
-    )
-    fig.colorbar(im1, ax=axs[0])
-    axs[0].set_title("Call Option P&L")
-
-    im2 = axs[1].imshow(
-        put_pnl, origin="lower", aspect="auto", cmap="RdYlGn",
-        extent=[s_min, s_max, v_min * 100, v_max * 100]
-    )
-    fig.colorbar(im2, ax=axs[1])
-    axs[1].set_title("Put Option P&L")
+    call_pnl = call_vals - np.float32(call_buy)
+    put_pnl = put_vals - np.float32(put_buy)
     
-    st.pyplot(fig)
\ No newline at end of file
+    extent = (s_min, s_max, v_min * 100, v_max * 100)
+    col1, col2 = st.columns(2)
+    col1.plotly_chart(_heatmap_fig(
+        call_pnl.tobytes(), call_pnl.dtype.str, call_pnl.shape,
+        extent, "RdYlGn", "Call Option P&L"
+    ))
+    col2.plotly_chart(_heatmap_fig(
+        put_pnl.tobytes(), put_pnl.dtype.str, put_pnl.shape,
+        extent, "RdYlGn", "Put Option P&L"
+    ))
\ No newline at end of file